@@ -0,0 +1,21 @@
+import os
+import sys
+from setuptools import Extension, setup
+
+extra_compile_args = []
+if sys.platform != "win32":
+    extra_compile_args = ["-O3", "-ftree-vectorize"]
+    # Tune for the build machine only on request, the binary is then not portable
+    if os.environ.get("BUFFER_NATIVE"):
+        extra_compile_args.append("-march=native")
+
+setup(
+    ext_modules=[
+        Extension(
+            "buffer._cqueue",
+            sources=["src/buffer/_cqueue.c"],
+            extra_compile_args=extra_compile_args,
+            optional=True,
+        ),
+    ],
+)
@@ -1,3 +1,8 @@
 from .circular_queue import CircularBuffer
 
-__all__ = ["CircularBuffer"]
+try:
+    from ._cqueue import CircularBuffer as CCircularBuffer
+except ImportError:  # C extension not built
+    CCircularBuffer = None
+
+__all__ = ["CircularBuffer", "CCircularBuffer"]
@@ -0,0 +1,552 @@
+/*
+ * C implementation of an int16 circular buffer.
+ *
+ * Mirrors buffer.circular_queue.CircularBuffer for the audio workload: the
+ * ring is a contiguous int16_t array and the head/tail/size bookkeeping lives
+ * in C scalars, so single-element operations avoid the Python frame and
+ * integer boxing, and bulk operations are two memcpy calls around the wrap.
+ */
+#define PY_SSIZE_T_CLEAN
+#include <Python.h>
+#include <stdint.h>
+#include <string.h>
+
+#define CACHE_LINE_SIZE 64
+
+/*
+ * head is written by the producer and tail by the consumer. The padding puts
+ * each on its own cache line, so writes to one do not invalidate the other.
+ * It only separates head and tail: size is written by both enqueue and
+ * dequeue, so its line stays shared by a concurrent producer/consumer. The
+ * padding is spacing rather than alignment: a full line between neighbours
+ * holds for any object address.
+ */
+typedef struct {
+    PyObject_HEAD
+    int16_t *items;         /* Ring storage */
+    Py_ssize_t size;        /* Current number of elements */
+    Py_ssize_t capacity;    /* Maximum number of elements (a power of 2) */
+    Py_ssize_t mask;        /* capacity - 1 */
+    int overwriting;        /* Overwrite oldest elements when full */
+    int resize;             /* Grow the ring when full */
+    int debug;              /* Raise exceptions on invalid operations */
+    char pad0[CACHE_LINE_SIZE];
+    Py_ssize_t head;        /* Index of the next position to enqueue */
+    char pad1[CACHE_LINE_SIZE - sizeof(Py_ssize_t)];
+    Py_ssize_t tail;        /* Index of the next position to dequeue */
+    char pad2[CACHE_LINE_SIZE - sizeof(Py_ssize_t)];
+} CircularBufferObject;
+
+/* Round n up to the nearest power of 2, or return -1 on overflow. */
+static Py_ssize_t
+next_power_of_2(Py_ssize_t n)
+{
+    Py_ssize_t p = 1;
+
+    while (p < n) {
+        if (p > PY_SSIZE_T_MAX / 2) {
+            return -1;
+        }
+        p <<= 1;
+    }
+    return p;
+}
+
+static inline Py_ssize_t
+wrap(CircularBufferObject *self, Py_ssize_t pointer)
+{
+    return pointer & self->mask;
+}
+
+/* Accept only native-order int16; a foreign byte order would be copied unswapped. */
+static int
+is_int16_format(const char *format)
+{
+    if (format == NULL) {
+        return 1;
+    }
+#if PY_LITTLE_ENDIAN
+    if (format[0] == '@' || format[0] == '=' || format[0] == '<') {
+#else
+    if (format[0] == '@' || format[0] == '=' || format[0] == '>' || format[0] == '!') {
+#endif
+        format++;
+    }
+    return strcmp(format, "h") == 0;
+}
+
+static int
+grow(CircularBufferObject *self, Py_ssize_t new_capacity)
+{
+    Py_ssize_t first, second;
+    int16_t *new_items;
+
+    if (new_capacity < self->size || new_capacity <= 0) {
+        PyErr_SetString(PyExc_ValueError, "Capacity must hold the current elements");
+        return -1;
+    }
+    new_capacity = next_power_of_2(new_capacity);
+    if (new_capacity < 0) {
+        PyErr_NoMemory();
+        return -1;
+    }
+    new_items = PyMem_New(int16_t, new_capacity);
+    if (new_items == NULL) {
+        PyErr_NoMemory();
+        return -1;
+    }
+
+    first = Py_MIN(self->size, self->capacity - self->tail);
+    second = self->size - first;
+    memcpy(new_items, self->items + self->tail, first * sizeof(int16_t));
+    memcpy(new_items + first, self->items, second * sizeof(int16_t));
+
+    PyMem_Free(self->items);
+    self->items = new_items;
+    self->capacity = new_capacity;
+    self->mask = new_capacity - 1;
+    self->head = wrap(self, self->size);
+    self->tail = 0;
+    return 0;
+}
+
+/* Copy n samples into the ring, applying the overwrite/resize policy. */
+static int
+ring_write(CircularBufferObject *self, const int16_t *src, Py_ssize_t n)
+{
+    Py_ssize_t space, overflow, first, second;
+
+    if (n <= 0) {
+        return 0;
+    }
+
+    space = self->capacity - self->size;
+    if (self->resize && n > space) {
+        if (grow(self, Py_MAX(self->capacity * 2, self->size + n)) < 0) {
+            return -1;
+        }
+        space = self->capacity - self->size;
+    }
+
+    if (!self->overwriting && n > space) {
+        n = space;
+    }
+    if (n <= 0) {
+        return 0;
+    }
+
+    /* Everything but the newest `capacity` samples would be overwritten unseen */
+    if (n > self->capacity) {
+        src += n - self->capacity;
+        n = self->capacity;
+    }
+
+    overflow = self->size + n - self->capacity;
+    if (overflow > 0) {
+        self->tail = wrap(self, self->tail + overflow);
+        self->size -= overflow;
+    }
+
+    first = Py_MIN(n, self->capacity - self->head);
+    second = n - first;
+    memcpy(self->items + self->head, src, first * sizeof(int16_t));
+    if (second) {
+        memcpy(self->items, src + first, second * sizeof(int16_t));
+    }
+
+    self->head = wrap(self, self->head + n);
+    self->size += n;
+    return 0;
+}
+
+static int
+as_int16(PyObject *value, int16_t *out)
+{
+    long v = PyLong_AsLong(value);
+
+    if (v == -1 && PyErr_Occurred()) {
+        return -1;
+    }
+    if (v < INT16_MIN || v > INT16_MAX) {
+        PyErr_Format(PyExc_OverflowError, "Value %ld out of int16 range", v);
+        return -1;
+    }
+    *out = (int16_t)v;
+    return 0;
+}
+
+static int
+CircularBuffer_init(CircularBufferObject *self, PyObject *args, PyObject *kwds)
+{
+    static char *kwlist[] = {"capacity", "items", "OVERWRITING", "RESIZE", "DEBUG", NULL};
+    PyObject *capacity_obj = Py_None, *items = Py_None;
+    int overwriting = 0, resize = 0, debug = 0;
+    Py_ssize_t capacity;
+
+    if (!PyArg_ParseTupleAndKeywords(args, kwds, "O|Oppp", kwlist, &capacity_obj,
+                                     &items, &overwriting, &resize, &debug)) {
+        return -1;
+    }
+
+    if (capacity_obj == Py_None) {
+        if (items == Py_None) {
+            PyErr_SetString(PyExc_ValueError, "Capacity or items must be passed in");
+            return -1;
+        }
+        capacity = PyObject_Length(items);
+    }
+    else {
+        capacity = PyNumber_AsSsize_t(capacity_obj, PyExc_OverflowError);
+    }
+    if (capacity == -1 && PyErr_Occurred()) {
+        return -1;
+    }
+    if (capacity <= 0) {
+        PyErr_SetString(PyExc_ValueError, "Capacity must be positive");
+        return -1;
+    }
+    capacity = next_power_of_2(capacity);
+    if (capacity < 0) {
+        PyErr_NoMemory();
+        return -1;
+    }
+
+    PyMem_Free(self->items);
+    self->items = PyMem_New(int16_t, capacity);
+    if (self->items == NULL) {
+        PyErr_NoMemory();
+        return -1;
+    }
+    self->capacity = capacity;
+    self->mask = capacity - 1;
+    self->head = 0;
+    self->tail = 0;
+    self->size = 0;
+    self->overwriting = overwriting;
+    self->resize = resize;
+    self->debug = debug;
+
+    if (items != Py_None) {
+        PyObject *result;
+
+        if (debug) {
+            Py_ssize_t n = PyObject_Length(items);
+            if (n < 0) {
+                return -1;
+            }
+            if (n > capacity) {
+                PyErr_SetString(PyExc_ValueError, "Items exceed capacity");
+                return -1;
+            }
+        }
+        result = PyObject_CallMethod((PyObject *)self, "bulk_enqueue", "O", items);
+        if (result == NULL) {
+            return -1;
+        }
+        Py_DECREF(result);
+    }
+    return 0;
+}
+
+static void
+CircularBuffer_dealloc(CircularBufferObject *self)
+{
+    PyMem_Free(self->items);
+    Py_TYPE(self)->tp_free((PyObject *)self);
+}
+
+static PyObject *
+CircularBuffer_peek(CircularBufferObject *self, PyObject *Py_UNUSED(ignored))
+{
+    if (self->size == 0) {
+        if (self->debug) {
+            PyErr_SetString(PyExc_ValueError, "Circular Buffer is empty");
+            return NULL;
+        }
+        Py_RETURN_NONE;
+    }
+    return PyLong_FromLong(self->items[self->tail]);
+}
+
+static PyObject *
+CircularBuffer_is_empty(CircularBufferObject *self, PyObject *Py_UNUSED(ignored))
+{
+    return PyBool_FromLong(self->size == 0);
+}
+
+static PyObject *
+CircularBuffer_is_full(CircularBufferObject *self, PyObject *Py_UNUSED(ignored))
+{
+    return PyBool_FromLong(self->size == self->capacity);
+}
+
+static PyObject *
+CircularBuffer_enqueue(CircularBufferObject *self, PyObject *value)
+{
+    int16_t v;
+
+    if (as_int16(value, &v) < 0) {
+        return NULL;
+    }
+
+    if (self->size == self->capacity) {
+        if (self->overwriting) {
+            self->tail = wrap(self, self->tail + 1);
+            self->size--;
+        }
+        else if (self->resize) {
+            if (grow(self, self->capacity * 2) < 0) {
+                return NULL;
+            }
+        }
+        else if (self->debug) {
+            PyErr_SetString(PyExc_ValueError, "Queue is full");
+            return NULL;
+        }
+        else {
+            Py_RETURN_NONE;
+        }
+    }
+
+    self->items[self->head] = v;
+    self->head = wrap(self, self->head + 1);
+    self->size++;
+    Py_RETURN_NONE;
+}
+
+static PyObject *
+CircularBuffer_bulk_enqueue(CircularBufferObject *self, PyObject *items)
+{
+    Py_buffer view;
+    PyObject *seq;
+    Py_ssize_t i, n;
+    int16_t *tmp;
+    int rc;
+
+    if (items == Py_None) {
+        Py_RETURN_NONE;
+    }
+
+    /* Contiguous buffers are copied directly; strided ones take the sequence path */
+    if (PyObject_CheckBuffer(items) &&
+        PyObject_GetBuffer(items, &view, PyBUF_C_CONTIGUOUS | PyBUF_FORMAT) == 0) {
+        if (view.itemsize != sizeof(int16_t) || !is_int16_format(view.format)) {
+            PyBuffer_Release(&view);
+            PyErr_SetString(PyExc_TypeError, "Buffer items must be int16");
+            return NULL;
+        }
+        rc = ring_write(self, (const int16_t *)view.buf, view.len / sizeof(int16_t));
+        PyBuffer_Release(&view);
+        if (rc < 0) {
+            return NULL;
+        }
+        Py_RETURN_NONE;
+    }
+
+    PyErr_Clear();
+
+    /* Generic sequences are converted to a temporary int16 block once */
+    seq = PySequence_Fast(items, "items must be a sequence or int16 buffer");
+    if (seq == NULL) {
+        return NULL;
+    }
+    n = PySequence_Fast_GET_SIZE(seq);
+    tmp = PyMem_New(int16_t, n > 0 ? n : 1);
+    if (tmp == NULL) {
+        Py_DECREF(seq);
+        return PyErr_NoMemory();
+    }
+    for (i = 0; i < n; i++) {
+        if (as_int16(PySequence_Fast_GET_ITEM(seq, i), &tmp[i]) < 0) {
+            PyMem_Free(tmp);
+            Py_DECREF(seq);
+            return NULL;
+        }
+    }
+    rc = ring_write(self, tmp, n);
+    PyMem_Free(tmp);
+    Py_DECREF(seq);
+    if (rc < 0) {
+        return NULL;
+    }
+    Py_RETURN_NONE;
+}
+
+static PyObject *
+CircularBuffer_dequeue(CircularBufferObject *self, PyObject *Py_UNUSED(ignored))
+{
+    int16_t value;
+
+    if (self->size == 0) {
+        if (self->debug) {
+            PyErr_SetString(PyExc_ValueError, "Circular Buffer is empty");
+            return NULL;
+        }
+        Py_RETURN_NONE;
+    }
+
+    value = self->items[self->tail];
+    self->tail = wrap(self, self->tail + 1);
+    self->size--;
+    return PyLong_FromLong(value);
+}
+
+/* Copy count samples out of the ring into dst and advance the tail. */
+static void
+ring_read(CircularBufferObject *self, int16_t *dst, Py_ssize_t count)
+{
+    Py_ssize_t first = Py_MIN(count, self->capacity - self->tail);
+    Py_ssize_t second = count - first;
+
+    memcpy(dst, self->items + self->tail, first * sizeof(int16_t));
+    if (second) {
+        memcpy(dst + first, self->items, second * sizeof(int16_t));
+    }
+    self->tail = wrap(self, self->tail + count);
+    self->size -= count;
+}
+
+static PyObject *
+CircularBuffer_bulk_dequeue(CircularBufferObject *self, PyObject *args, PyObject *kwds)
+{
+    static char *kwlist[] = {"amount", "out", NULL};
+    Py_ssize_t amount, count;
+    PyObject *out = Py_None, *raw, *view, *result;
+    Py_buffer dst;
+
+    if (!PyArg_ParseTupleAndKeywords(args, kwds, "n|O:bulk_dequeue", kwlist, &amount, &out)) {
+        return NULL;
+    }
+    count = Py_MAX(0, Py_MIN(amount, self->size));
+
+    if (out != Py_None) {
+        if (PyObject_GetBuffer(out, &dst, PyBUF_WRITABLE | PyBUF_C_CONTIGUOUS | PyBUF_FORMAT) < 0) {
+            return NULL;
+        }
+        if (dst.itemsize != sizeof(int16_t) || !is_int16_format(dst.format)) {
+            PyBuffer_Release(&dst);
+            PyErr_SetString(PyExc_TypeError, "out must be an int16 buffer");
+            return NULL;
+        }
+        if (dst.len / (Py_ssize_t)sizeof(int16_t) < count) {
+            PyBuffer_Release(&dst);
+            PyErr_SetString(PyExc_ValueError, "out is too small");
+            return NULL;
+        }
+        ring_read(self, (int16_t *)dst.buf, count);
+        PyBuffer_Release(&dst);
+        return PySequence_GetSlice(out, 0, count);
+    }
+
+    raw = PyByteArray_FromStringAndSize(NULL, count * sizeof(int16_t));
+    if (raw == NULL) {
+        return NULL;
+    }
+    ring_read(self, (int16_t *)PyByteArray_AS_STRING(raw), count);
+
+    view = PyMemoryView_FromObject(raw);
+    Py_DECREF(raw);
+    if (view == NULL) {
+        return NULL;
+    }
+    result = PyObject_CallMethod(view, "cast", "s", "h");
+    Py_DECREF(view);
+    return result;
+}
+
+static PyObject *
+CircularBuffer_resize(CircularBufferObject *self, PyObject *args)
+{
+    PyObject *new_capacity_obj = Py_None;
+    Py_ssize_t new_capacity;
+
+    if (!PyArg_ParseTuple(args, "|O:resize", &new_capacity_obj)) {
+        return NULL;
+    }
+    if (!self->resize) {
+        Py_RETURN_NONE;
+    }
+
+    if (new_capacity_obj == Py_None) {
+        new_capacity = Py_MAX(self->capacity * 2, self->size + 1);
+    }
+    else {
+        if (!PyLong_Check(new_capacity_obj)) {
+            PyErr_Format(PyExc_TypeError, "Capacity must be int, got %R: %R",
+                         Py_TYPE(new_capacity_obj), new_capacity_obj);
+            return NULL;
+        }
+        new_capacity = PyLong_AsSsize_t(new_capacity_obj);
+        if (new_capacity == -1 && PyErr_Occurred()) {
+            return NULL;
+        }
+    }
+
+    if (grow(self, new_capacity) < 0) {
+        return NULL;
+    }
+    Py_RETURN_NONE;
+}
+
+static PyMethodDef CircularBuffer_methods[] = {
+    {"peek", (PyCFunction)CircularBuffer_peek, METH_NOARGS,
+     "Get the element at the tail without dequeuing."},
+    {"is_empty", (PyCFunction)CircularBuffer_is_empty, METH_NOARGS,
+     "Check if the queue is empty."},
+    {"is_full", (PyCFunction)CircularBuffer_is_full, METH_NOARGS,
+     "Check if the queue is full."},
+    {"enqueue", (PyCFunction)CircularBuffer_enqueue, METH_O,
+     "Add an element to the queue."},
+    {"bulk_enqueue", (PyCFunction)CircularBuffer_bulk_enqueue, METH_O,
+     "Add multiple elements from an int16 buffer or a sequence of ints."},
+    {"dequeue", (PyCFunction)CircularBuffer_dequeue, METH_NOARGS,
+     "Remove and return the element at the tail."},
+    {"bulk_dequeue", (PyCFunction)(void (*)(void))CircularBuffer_bulk_dequeue,
+     METH_VARARGS | METH_KEYWORDS,
+     "Remove multiple elements from the tail, returned as an int16 memoryview\n"
+     "or, when an int16 `out` buffer is given, copied into it."},
+    {"resize", (PyCFunction)CircularBuffer_resize, METH_VARARGS,
+     "Resize the queue to a new capacity (doubles it if omitted)."},
+    {NULL, NULL, 0, NULL}
+};
+
+static PyTypeObject CircularBufferType = {
+    PyVarObject_HEAD_INIT(NULL, 0)
+    .tp_name = "buffer._cqueue.CircularBuffer",
+    .tp_doc = PyDoc_STR("An int16 circular queue (ring buffer) implemented in C."),
+    .tp_basicsize = sizeof(CircularBufferObject),
+    .tp_itemsize = 0,
+    .tp_flags = Py_TPFLAGS_DEFAULT | Py_TPFLAGS_BASETYPE,
+    .tp_new = PyType_GenericNew,
+    .tp_init = (initproc)CircularBuffer_init,
+    .tp_dealloc = (destructor)CircularBuffer_dealloc,
+    .tp_methods = CircularBuffer_methods,
+};
+
+static struct PyModuleDef cqueue_module = {
+    PyModuleDef_HEAD_INIT,
+    .m_name = "buffer._cqueue",
+    .m_doc = "C implementation of the int16 circular buffer.",
+    .m_size = -1,
+};
+
+PyMODINIT_FUNC
+PyInit__cqueue(void)
+{
+    PyObject *m;
+
+    if (PyType_Ready(&CircularBufferType) < 0) {
+        return NULL;
+    }
+    m = PyModule_Create(&cqueue_module);
+    if (m == NULL) {
+        return NULL;
+    }
+    Py_INCREF(&CircularBufferType);
+    if (PyModule_AddObject(m, "CircularBuffer", (PyObject *)&CircularBufferType) < 0) {
+        Py_DECREF(&CircularBufferType);
+        Py_DECREF(m);
+        return NULL;
+    }
+    return m;
+}
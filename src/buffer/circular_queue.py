@@ -1,30 +1,58 @@
 from __future__ import annotations
 from typing import Final, Generic, TypeVar, Optional, Sequence
 from numbers import Number
-from collections import deque
+import array
 import math
 import numpy as np
 
 T = TypeVar("T", bound=Number)
+
+def _next_power_of_2(n: int) -> int:
+    """Round n up to the nearest power of 2 (at least 1)."""
+    return 1 << max(0, n - 1).bit_length()
+
 class CircularBuffer(Generic[T]):
     """
-    A thread-safe circular queue (ring buffer) implementation with optional 
+    A circular queue (ring buffer) implementation with optional 
     overwriting and resizing.
 
+    Passing NPARR=True returns a NumpyCircularBuffer (see circular_queue_np),
+    which is only imported when first requested. Subclasses that want NumPy
+    storage must derive from NumpyCircularBuffer; passing NPARR=True to any
+    other subclass raises TypeError.
+
+    There is no internal locking. In single-producer/single-consumer use,
+    enqueue stores the element before publishing the new head and dequeue
+    reads the element before publishing the new tail, but _size is shared
+    by both sides, so concurrent use across threads needs an external lock.
+
     Attributes:
-        _items (list[Optional[T]]): Internal storage for the queue elements.
-        _capacity (int): Maximum number of elements the queue can hold.
+        _items (list[Optional[T]] | array.array): Internal storage for the queue elements.
+        _capacity (int): Maximum number of elements the queue can hold (a power of 2).
+        _mask (int): capacity - 1, used to wrap pointers with a bitwise and.
         _head (int): Index of the next position to enqueue.
         _tail (int): Index of the next position to dequeue.
         _size (int): Current number of elements in the queue.
         _OVERWRITING (bool): Whether to overwrite oldest elements when full.
         _RESIZE (bool): Whether to automatically resize the queue when full.
         _DEBUG (bool): Whether to raise exceptions on invalid operations.
-        _POW_2 (bool): Whether the capacity is a power of 2 (for faster modulo).
-        lock (Lock): Threading lock for concurrent access.
+        _TYPECODE (Optional[str]): array.array typecode for typed storage, None for a list.
+        _view (list[Optional[T]] | array.array): Handle used for single-element access; _items
+            here, a memoryview in NumpyCircularBuffer.
+        _on_full (Callable): Full-queue policy for enqueue, chosen once from the flags.
     """
 
-    __slots__ = {"_items", "_OVERWRITING", "_head", "_tail", "_size", "_capacity", "_POW_2", "_RESIZE", "_DEBUG", "lock", "_NPARR"}
+    __slots__ = {"_items", "_OVERWRITING", "_head", "_tail", "_size", "_capacity", "_mask", "_RESIZE", "_DEBUG", "_TYPECODE", "_view", "_on_full"}
+
+    def __new__(cls, *args, **kwargs) -> CircularBuffer[T]:
+        nparr = kwargs.get("NPARR", args[4] if len(args) > 4 else False)
+        if nparr:
+            from .circular_queue_np import NumpyCircularBuffer
+            if cls is CircularBuffer:
+                cls = NumpyCircularBuffer
+            elif not issubclass(cls, NumpyCircularBuffer):
+                raise TypeError(f"NPARR=True needs a NumpyCircularBuffer subclass, got {cls.__name__}")
+        return super().__new__(cls)
 
     def __init__(
         self, 
@@ -33,20 +61,24 @@ class CircularBuffer(Generic[T]):
         OVERWRITING: Optional[bool] = False, 
         RESIZE: Optional[bool] = False, 
         NPARR : Optional[bool] = False,
-        DEBUG: Optional[bool] = False
+        DEBUG: Optional[bool] = False,
+        TYPECODE: Optional[str] = None
     ) -> None:
         """
         Initialize the CircularQueue.
 
         Args:
-            capacity (Optional[int]): Maximum capacity of the queue.
+            capacity (Optional[int]): Maximum capacity of the queue, rounded up to a power of 2.
             items (Optional[Sequence[T]]): Initial elements to populate the queue.
             OVERWRITING (Optional[bool]): Overwrite old elements if full.
             RESIZE (Optional[bool]): Automatically resize if full.
+            NPARR (Optional[bool]): Store int16 elements in a NumPy array (creates a NumpyCircularBuffer).
             DEBUG (Optional[bool]): Enable debug checks.
+            TYPECODE (Optional[str]): Store elements unboxed in an array.array of this
+                typecode (e.g. 'h' for int16) instead of a list. Ignored with NPARR.
 
         Raises:
-            ValueError: If both capacity and items are None or invalid values.
+            ValueError: If capacity is not positive, or both capacity and items are None (DEBUG).
         """
         if capacity is None and items is None and DEBUG: 
             raise ValueError("Capacity or items must be passed in")
@@ -54,27 +86,36 @@ class CircularBuffer(Generic[T]):
         if capacity is None: 
             capacity = len(items)
 
-        if capacity <= 0 and DEBUG:
+        if capacity <= 0:
             raise ValueError("Capacity must be positive")
 
+        capacity = _next_power_of_2(capacity)
         self._capacity = capacity
+        self._mask = capacity - 1
         self._size = 0
 
-        if not NPARR:
-            self._items: list[Optional[T]] = [None] * capacity
-        else:
-            self._items = np.zeros(capacity, dtype=np.int16)
-
         self._OVERWRITING = OVERWRITING
         self._RESIZE = RESIZE
-        self._NPARR = NPARR
         self._DEBUG = DEBUG
+        self._TYPECODE = None if NPARR else TYPECODE
+
+        # Stored unbound (called as self._on_full(self, value)) to avoid a reference cycle;
+        # looked up on type(self) so subclasses can override a policy
+        cls = type(self)
+        if OVERWRITING:
+            self._on_full = cls._overwrite_on_full
+        elif RESIZE:
+            self._on_full = cls._resize_on_full
+        elif DEBUG:
+            self._on_full = cls._raise_on_full
+        else:
+            self._on_full = cls._drop_on_full
+
+        self._set_storage(self._allocate(capacity))
 
         self._head = 0 #Write Pointer
         self._tail = 0 #Read Pointer
 
-        self._POW_2 = self._is_power_of_2()
-
         if items:
             if len(items) > capacity and DEBUG:
                 raise ValueError("Items exceed capacity")
@@ -82,25 +123,44 @@ class CircularBuffer(Generic[T]):
             for value in items:
                 self.enqueue(value)
 
-    def _is_power_of_2(self) -> bool:
-        """Check if the capacity is a power of 2."""
-        return self._capacity > 0 and (self._capacity & (self._capacity - 1)) == 0
-    
-    def _move_pointer(self, pointer: int, step: int = 1) -> int:
-        """
-        Move a pointer forward by a given step, wrapping around the queue.
+    def _allocate(self, capacity: int) -> list[Optional[T]] | array.array:
+        """Allocate empty storage of the configured type for `capacity` elements."""
+        if self._TYPECODE is not None:
+            return array.array(self._TYPECODE, [0]) * capacity
+        return [None] * capacity
 
-        Args:
-            pointer (int): Current index.
-            step (int): Steps to move forward.
+    def _set_storage(self, items: list[Optional[T]] | array.array) -> None:
+        """Install new storage and the handle used for single-element access."""
+        self._items = items
+        self._view = items
 
-        Returns:
-            int: New index after moving.
+    def _coerce(self, items: Sequence[T]) -> Sequence[T]:
         """
-        if self._POW_2:
-            return (pointer + step) & (self._capacity - 1)
-        else:
-            return (pointer + step) % self._capacity
+        Convert bulk input once so slice assignment into the storage is a single C-level
+        copy: a same-typed array.array for TYPECODE storage, a list otherwise.
+        """
+        if self._TYPECODE is not None:
+            if isinstance(items, array.array) and items.typecode == self._TYPECODE:
+                return items
+            # Raw bytes only when the dtype already matches; otherwise array.array checks
+            # each value the way enqueue does (no float truncation or integer wrap-around)
+            if isinstance(items, np.ndarray) and items.dtype == np.dtype(self._TYPECODE):
+                return array.array(self._TYPECODE, items.tobytes())
+            items = array.array(self._TYPECODE, items)
+        elif isinstance(items, np.ndarray):
+            items = items.tolist()
+        return items
+
+    def _copy_in(self, items: Sequence[T], start: int, count: int) -> None:
+        """Copy items[start:start + count] into the ring at head, wrapping once."""
+        head = self._head
+        first_part = min(count, self._capacity - head)
+        second_part = count - first_part
+
+        self._items[head : head + first_part] = items[start : start + first_part]
+
+        if second_part:
+            self._items[:second_part] = items[start + first_part : start + count]
 
     def peek(self) -> T:
         """
@@ -112,9 +172,9 @@ class CircularBuffer(Generic[T]):
         Raises:
             ValueError: If the queue is empty and DEBUG is True.
         """
-        if self.is_empty() and self._DEBUG:
+        if self._size == 0 and self._DEBUG:
             raise ValueError("Circular Buffer is empty")
-        return self._items[self._tail]
+        return self._view[self._tail]
     
     def is_empty(self) -> bool:
         """Check if the queue is empty."""
@@ -134,19 +194,31 @@ class CircularBuffer(Generic[T]):
         Raises:
             ValueError: If queue is full and neither OVERWRITING nor RESIZE is enabled (DEBUG=True).
         """
-        if self.is_full():
-            if self._OVERWRITING:
-                self._tail = self._move_pointer(self._tail)
-            elif self._RESIZE:
-                self.resize()
-            else:
-                if self._DEBUG:
-                    raise ValueError("Queue is full")
-        else:
-            self._size += 1
+        if self._size == self._capacity:
+            self._on_full(self, value)
+            return
+
+        self._view[self._head] = value
+        self._head = (self._head + 1) & self._mask
+        self._size += 1
+
+    def _overwrite_on_full(self, value: T) -> None:
+        """Replace the oldest element with value."""
+        self._view[self._head] = value
+        self._head = (self._head + 1) & self._mask
+        self._tail = self._head
+
+    def _resize_on_full(self, value: T) -> None:
+        """Grow the queue, then enqueue value."""
+        self.resize()
+        self.enqueue(value)
 
-        self._items[self._head] = value
-        self._head = self._move_pointer(self._head)
+    def _raise_on_full(self, value: T) -> None:
+        """Reject value (DEBUG)."""
+        raise ValueError("Queue is full")
+
+    def _drop_on_full(self, value: T) -> None:
+        """Discard value, as bulk_enqueue does with elements that do not fit."""
 
     def bulk_enqueue(self, items: Sequence[T]) -> None:
         """
@@ -160,32 +232,30 @@ class CircularBuffer(Generic[T]):
         """
         if items is None or len(items) == 0: return
 
+        items = self._coerce(items)
+
         input_size: int = len(items)
         space_in_buffer  : int = self._capacity - self._size
 
         if self._RESIZE and input_size > space_in_buffer:
-            self.resize(max(self._capacity * 2, self._size + 1))
+            self.resize(max(self._capacity * 2, self._size + input_size))
+            space_in_buffer = self._capacity - self._size
 
         if not self._OVERWRITING and input_size > space_in_buffer:
             input_size = space_in_buffer
-            items = items[:space_in_buffer]
 
         if input_size <= 0: return
 
-        #Overwriting buffer for overflow
+        #Overwriting buffer for overflow, only the newest `capacity` elements survive
+        start = max(0, input_size - self._capacity)
+        input_size -= start
         overflow = max(0, self._size + input_size - self._capacity)
         if overflow:
-            self._tail = self._move_pointer(self._tail, overflow)
+            self._tail = (self._tail + overflow) & self._mask
             self._size -= overflow 
-        first_part = min(input_size, self._capacity - self._head)
-        second_part = input_size - first_part
-
-        self._items[self._head : self._head + first_part] = items[:first_part]
 
-        if second_part:
-            self._items[:second_part] = items[first_part:]
-
-        self._head = self._move_pointer(self._head, input_size)
+        self._copy_in(items, start, input_size)
+        self._head = (self._head + input_size) & self._mask
         self._size += input_size 
 
     def dequeue(self) -> T:
@@ -198,28 +268,36 @@ class CircularBuffer(Generic[T]):
         Raises:
             ValueError: If queue is empty and DEBUG=True.
         """
-        if self.is_empty() and self._DEBUG:
+        if self._size == 0 and self._DEBUG:
             raise ValueError("Circular Buffer is empty")
         
-        value: T = self._items[self._tail]
-        self._tail = self._move_pointer(self._tail)
+        value: T = self._view[self._tail]
+        self._tail = (self._tail + 1) & self._mask
         self._size -= 1
 
         return value
     
-    def bulk_dequeue(self, amount: int) -> list[T]:
+    def bulk_dequeue(self, amount: int, out: Optional[np.ndarray] = None) -> array.array | list[T]:
         """
         Remove and return multiple elements from the tail.
 
         Args:
             amount (int): Number of elements to dequeue.
+            out (Optional[np.ndarray]): Caller-owned array to copy the elements into,
+                avoiding an allocation per call (NPARR only). Must hold at least `amount` elements.
 
         Returns:
-            list[T]: List of dequeued elements.
+            array.array | list[T]: Dequeued elements, in the storage's type.
+
+        Raises:
+            TypeError: If `out` is passed without NPARR storage.
         """
-        count: int = min(amount, self._size)
+        count: int = max(0, min(amount, self._size))
+
+        if out is not None:
+            raise TypeError("out is only supported with NPARR storage")
 
-        if count == 0: return []
+        if count == 0: return self._items[:0]
 
         tail = self._tail
         capacity = self._capacity
@@ -229,50 +307,62 @@ class CircularBuffer(Generic[T]):
 
         remaining = count - first_part
         if remaining > 0:
-            if not self._NPARR:
-                out += self._items[0:remaining]
-            else:
-                out = np.concatenate((
-                    self._items[tail : tail + first_part],
-                    self._items[0:remaining]
-                ))
-
-        self._tail = self._move_pointer(self._tail, count)
+            out += self._items[0:remaining]
+
+        self._tail = (self._tail + count) & self._mask
         self._size -= count
 
         return out
         
+    def release(self, arr: np.ndarray) -> None:
+        """
+        Hand an array returned by bulk_dequeue back for reuse (NPARR only).
+
+        List and array.array storage do not pool their results, so this is a no-op.
+
+        Args:
+            arr (np.ndarray): Array previously returned by bulk_dequeue.
+        """
+
     def resize(self, new_capacity: Optional[int] = None) -> None:
         """
         Resize the queue to a new capacity.
 
         Args:
-            new_capacity (Optional[int]): New capacity. If None, doubles the current capacity.
+            new_capacity (Optional[int]): New capacity, rounded up to a power of 2. If None, doubles the current capacity.
+
+        Raises:
+            TypeError: If new_capacity is not an int.
+            ValueError: If new_capacity cannot hold the current elements.
         """
         if not self._RESIZE:
             return
 
-        if self._NPARR:
-            if self._DEBUG:
-                raise ValueError("Cannot resize nparrays")
-            return
-        
         if new_capacity is None:
              new_capacity = max(self._capacity * 2, self._size + 1)
 
         if not isinstance(new_capacity, int):
             raise TypeError(f"Capacity must be int, got {type(new_capacity)}: {new_capacity}")
+
+        if new_capacity < self._size:
+            raise ValueError("Capacity must hold the current elements")
         
-        new_items: list[Optional[T]] = [None] * new_capacity
+        new_capacity = _next_power_of_2(new_capacity)
+        new_items = self._allocate(new_capacity)
 
-        for i in range(self._size):
-            new_items[i] = self._items[(self._tail + i) % self._capacity]
+        # Unwrap into the new storage with two contiguous copies: tail -> end, then 0 -> head
+        tail = self._tail
+        first_part = min(self._size, self._capacity - tail)
+        remaining = self._size - first_part
+        new_items[:first_part] = self._items[tail : tail + first_part]
+        if remaining:
+            new_items[first_part : first_part + remaining] = self._items[:remaining]
         
-        self._items = new_items
+        self._set_storage(new_items)
         self._capacity = new_capacity
-        self._head = self._size
+        self._mask = new_capacity - 1
+        self._head = self._size & self._mask
         self._tail = 0
-        self._POW_2 = self._is_power_of_2()
 
     def print(self) -> None:
         """Print the internal array of the queue (debugging)."""
@@ -289,13 +379,17 @@ class CircularBuffer(Generic[T]):
         center_x, center_y = width // 2, height // 2
         canvas = [[" " for _ in range(width)] for _ in range(height)]
 
+        # Slot coordinates for every index at once, one vectorized trig call each
+        angles = np.linspace(-math.pi / 2, 3 * math.pi / 2, self._capacity, endpoint=False)
+        xs = (center_x + radius * np.cos(angles) * aspect_ratio).astype(np.intp).tolist()
+        ys = (center_y + radius * np.sin(angles)).astype(np.intp).tolist()
+
         for i in range(self._capacity):
-            angle = (2 * math.pi * i / self._capacity) - (math.pi / 2)
-            x = int(center_x + radius * math.cos(angle) * aspect_ratio)
-            y = int(center_y + radius * math.sin(angle))
+            x = xs[i]
+            y = ys[i]
 
-            is_head = (i == self._head % self._capacity)
-            is_tail = (i == self._tail % self._capacity)
+            is_head = (i == self._head)
+            is_tail = (i == self._tail)
             val = self._items[i]
             display_val = f"({val})" if val is not None else "[ ]"
             
@@ -321,6 +415,6 @@ class CircularBuffer(Generic[T]):
         print(f"{border}\n")
 
 if __name__ == "__main__":
-    d = CircularBuffer(5, None, True, False, True)
+    d = CircularBuffer(5, None, OVERWRITING=True)
     d.bulk_enqueue([1,2,3,4,5,6])
     d.print_circle()
\ No newline at end of file
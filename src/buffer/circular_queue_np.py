@@ -0,0 +1,177 @@
+from __future__ import annotations
+from typing import Final, Optional, Sequence
+import weakref
+import numpy as np
+
+from .circular_queue import CircularBuffer
+
+class NumpyCircularBuffer(CircularBuffer[int]):
+    """
+    A circular queue over int16 NumPy storage, created by CircularBuffer(..., NPARR=True).
+
+    Bulk copies are at most two ndarray slice assignments around the wrap.
+    bulk_dequeue can copy into a caller-supplied array, or reuse arrays handed
+    back with release().
+
+    Elements must be integers in int16 range. enqueue and bulk_enqueue both raise
+    TypeError for other types (floats are not truncated) and ValueError for values
+    out of range.
+
+    Attributes:
+        _pool (list[np.ndarray]): Released bulk_dequeue arrays reused by later calls.
+        _pool_size_hint (int): Size of the arrays currently held in _pool.
+        _issued (Optional[dict[int, weakref.ref]]): Arrays allocated by bulk_dequeue, keyed
+            by id; release() only pools these. None until the first release(), so callers
+            that never release pay nothing for the tracking.
+    """
+
+    _POOL_MAX: Final[int] = 8
+
+    __slots__ = {"_pool", "_pool_size_hint", "_issued"}
+
+    def __init__(
+        self,
+        capacity: Optional[int],
+        items: Optional[Sequence[int]] = None,
+        OVERWRITING: Optional[bool] = False,
+        RESIZE: Optional[bool] = False,
+        NPARR : Optional[bool] = True,
+        DEBUG: Optional[bool] = False,
+        TYPECODE: Optional[str] = None
+    ) -> None:
+        """
+        Initialize the queue. Arguments match CircularBuffer; NPARR and TYPECODE are ignored.
+        """
+        self._pool: list[np.ndarray] = []
+        self._pool_size_hint = 0
+        self._issued: Optional[dict[int, weakref.ref]] = None
+
+        super().__init__(capacity, items, OVERWRITING, RESIZE, True, DEBUG)
+
+    def __getstate__(self) -> tuple[None, dict]:
+        """Pickle/copy state without the memoryview and pool, which cannot be pickled."""
+        _, state = super().__getstate__()
+        for name in ("_view", "_pool", "_issued"):
+            state.pop(name, None)
+        return None, state
+
+    def __setstate__(self, state: tuple[None, dict]) -> None:
+        """Restore pickled state and rebuild the memoryview and an empty pool."""
+        _, slots = state
+        for name, value in slots.items():
+            setattr(self, name, value)
+        self._pool = []
+        self._pool_size_hint = 0
+        self._issued = None
+        self._set_storage(self._items)
+
+    def _allocate(self, capacity: int) -> np.ndarray:
+        """Allocate zeroed int16 storage for `capacity` elements."""
+        return np.zeros(capacity, dtype=np.int16)
+
+    def _set_storage(self, items: np.ndarray) -> None:
+        """Install new storage; single elements go through a memoryview (skips ndarray scalar dispatch)."""
+        self._items = items
+        self._view = memoryview(items)
+
+    def _coerce(self, items: Sequence[int]) -> np.ndarray:
+        """
+        Convert bulk input to int16 once so every later slice is a same-dtype view.
+        Values are checked the way the memoryview checks them in enqueue.
+        """
+        if isinstance(items, np.ndarray) and items.dtype == np.int16:
+            return items
+
+        items = np.asarray(items)
+        if items.dtype.kind not in "biu":
+            raise TypeError(f"Elements must be integers, got {items.dtype}")
+
+        converted = items.astype(np.int16)
+        if not np.array_equal(converted, items):
+            raise ValueError("Elements out of int16 range")
+        return converted
+
+    def bulk_dequeue(self, amount: int, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Remove and return multiple elements from the tail.
+
+        Args:
+            amount (int): Number of elements to dequeue.
+            out (Optional[np.ndarray]): Caller-owned array to copy the elements into,
+                avoiding an allocation per call. Must hold at least `amount` elements.
+
+        Returns:
+            np.ndarray: Dequeued elements. With `out` this is a view of `out` trimmed to
+                the number of elements dequeued.
+
+        Raises:
+            TypeError: If `out` is not a native-order int16 array.
+            ValueError: If `out` cannot hold the elements dequeued.
+        """
+        count: int = max(0, min(amount, self._size))
+
+        if out is None:
+            if self._pool and self._pool_size_hint == count:
+                out = self._pool.pop()
+            else:
+                out = np.empty(count, dtype=self._items.dtype)
+                if self._issued is not None:
+                    self._track(out)
+        else:
+            if out.dtype != self._items.dtype:
+                raise TypeError("out must be an int16 buffer")
+            if len(out) < count:
+                raise ValueError("out is too small")
+            # A view of the caller's array, never tracked, so release() ignores it
+            out = out[:count]
+
+        if count:
+            tail = self._tail
+            first_part = min(count, self._capacity - tail)
+            out[:first_part] = self._items[tail : tail + first_part]
+
+            remaining = count - first_part
+            if remaining:
+                out[first_part:count] = self._items[:remaining]
+
+            self._tail = (self._tail + count) & self._mask
+            self._size -= count
+
+        return out
+
+    def _track(self, arr: np.ndarray) -> None:
+        """Record arr as allocated here; the entry is dropped when arr is freed."""
+        key = id(arr)
+        self._issued[key] = weakref.ref(arr, lambda _, key=key, issued=self._issued: issued.pop(key, None))
+
+    def release(self, arr: np.ndarray) -> None:
+        """
+        Hand an array returned by bulk_dequeue back for reuse.
+
+        Later bulk_dequeue calls of the same size take arrays from the pool instead of
+        allocating. The caller must not use `arr` after releasing it. Arrays this queue
+        did not allocate, including the result of bulk_dequeue(..., out=...), are
+        ignored so a caller's buffer is never handed out again. Tracking starts with the
+        first call, so arrays dequeued before then are not pooled.
+
+        Args:
+            arr (np.ndarray): Array previously returned by bulk_dequeue.
+        """
+        if self._issued is None:
+            self._issued = {}
+            return
+
+        ref = self._issued.get(id(arr))
+        if ref is None or ref() is not arr:
+            return
+
+        # Pooling the same array twice would hand it to two later bulk_dequeue calls
+        if any(pooled is arr for pooled in self._pool):
+            return
+
+        if arr.size != self._pool_size_hint:
+            self._pool.clear()
+            self._pool_size_hint = arr.size
+
+        if len(self._pool) < self._POOL_MAX:
+            self._pool.append(arr)
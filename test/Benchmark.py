@@ -2,7 +2,38 @@ import time
 import gc
 import numpy as np
 import statistics
-from buffer import CircularBuffer
+from buffer import CircularBuffer, CCircularBuffer
+
+LOW_INT = -32768
+HIGH_INT = 32767
+
+
+def make_buffer(
+    capacity: int,
+    overwriting: bool = False,
+    resize: bool = False,
+    use_numpy_storage: bool = False,
+    use_c_extension: bool = False,
+):
+    """Build a fresh buffer for a benchmark trial."""
+    if use_c_extension:
+        if CCircularBuffer is None:
+            raise RuntimeError("C extension not built; run `python setup.py build_ext --inplace`")
+        return CCircularBuffer(
+            capacity=capacity,
+            items=None,
+            OVERWRITING=overwriting,
+            RESIZE=resize,
+            DEBUG=False
+        )
+    return CircularBuffer(
+        capacity=capacity,
+        items=None,
+        OVERWRITING=overwriting,
+        RESIZE=resize,
+        NPARR=use_numpy_storage,
+        DEBUG=False
+    )
 
 # -------------------------------------------------
 # Audio Streaming Benchmark
@@ -15,6 +46,7 @@ def benchmark_audio_buffer(
     overwriting: bool = False,
     resize: bool = False,
     use_numpy_storage: bool = False,
+    use_c_extension: bool = False,
 ) -> None:
     """
     Statistically stable benchmark for bulk_enqueue + bulk_dequeue.
@@ -29,14 +61,23 @@ def benchmark_audio_buffer(
     # Pre-generate audio data
     # -----------------------------
     input_frame = np.random.randint(
-        -32768, 32767, size=frame_size, dtype=np.int16
+        LOW_INT, HIGH_INT, size=frame_size, dtype=np.int16
     )
 
     warmup_size = capacity // 2
     warmup_data = np.random.randint(
-        -32768, 32767, size=warmup_size, dtype=np.int16
+        LOW_INT, HIGH_INT, size=warmup_size, dtype=np.int16
+    )
+
+    # Caller-owned output frame reused by every bulk_dequeue (array storage only)
+    out_frame = (
+        np.empty(frame_size, dtype=np.int16)
+        if use_numpy_storage or use_c_extension else None
     )
 
+    # Integer nanosecond clock, bound locally and converted to seconds once per trial
+    clock = time.perf_counter_ns
+
     trial_times = []
     gc_was_enabled = gc.isenabled()
     gc.disable()
@@ -47,13 +88,8 @@ def benchmark_audio_buffer(
             # -----------------------------
             # Fresh buffer per trial
             # -----------------------------
-            buffer = CircularBuffer(
-                capacity=capacity,
-                items=None,
-                OVERWRITING=overwriting,
-                RESIZE=resize,
-                NPARR=use_numpy_storage,
-                DEBUG=False
+            buffer = make_buffer(
+                capacity, overwriting, resize, use_numpy_storage, use_c_extension
             )
 
             buffer.bulk_enqueue(warmup_data)
@@ -63,20 +99,20 @@ def benchmark_audio_buffer(
             # -----------------------------
             for _ in range(10_000):
                 buffer.bulk_enqueue(input_frame)
-                buffer.bulk_dequeue(frame_size)
+                buffer.bulk_dequeue(frame_size, out=out_frame)
 
             # -----------------------------
             # Timed section
             # -----------------------------
-            start = time.perf_counter()
+            start = clock()
 
             for _ in range(iterations):
                 buffer.bulk_enqueue(input_frame)
-                buffer.bulk_dequeue(frame_size)
+                buffer.bulk_dequeue(frame_size, out=out_frame)
 
-            end = time.perf_counter()
+            end = clock()
 
-            total_time = end - start
+            total_time = (end - start) * 1e-9
             trial_times.append(total_time)
 
             print(f"Trial {trial+1}: {total_time:.6f} sec")
@@ -121,6 +157,94 @@ def benchmark_audio_buffer(
     print("\nDone.\n")
 
 
+# -------------------------------------------------
+# Single-Element Benchmark
+# -------------------------------------------------
+def benchmark_circular_queue(
+    iterations: int = 1_000_000,
+    trials: int = 7,
+    use_numpy_storage: bool = False,
+    use_c_extension: bool = False,
+) -> None:
+    """
+    Benchmark for single-element enqueue and dequeue.
+
+    Values are pre-generated so the timed loops measure the buffer rather
+    than the random number generator.
+    """
+
+    print("Starting Circular Queue Benchmark...\n")
+
+    # -----------------------------
+    # Pre-generate values
+    # -----------------------------
+    values = np.random.randint(
+        LOW_INT, HIGH_INT + 1, size=iterations, dtype=np.int16
+    ).tolist()
+
+    clock = time.perf_counter_ns
+
+    enqueue_times = []
+    dequeue_times = []
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+
+    try:
+        for trial in range(trials):
+            buffer = make_buffer(
+                iterations, use_numpy_storage=use_numpy_storage, use_c_extension=use_c_extension
+            )
+
+            # Bind methods once so the loops do not pay an attribute lookup
+            enqueue = buffer.enqueue
+            dequeue = buffer.dequeue
+
+            # -----------------------------
+            # Timed sections
+            # -----------------------------
+            start = clock()
+
+            for value in values:
+                enqueue(value)
+
+            middle = clock()
+
+            for _ in range(iterations):
+                dequeue()
+
+            end = clock()
+
+            enqueue_time = (middle - start) * 1e-9
+            dequeue_time = (end - middle) * 1e-9
+            enqueue_times.append(enqueue_time)
+            dequeue_times.append(dequeue_time)
+
+            print(f"Trial {trial+1}: enqueue {enqueue_time:.6f} sec | dequeue {dequeue_time:.6f} sec")
+
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+    # -----------------------------
+    # Print Results
+    # -----------------------------
+    enqueue_median = statistics.median(enqueue_times)
+    dequeue_median = statistics.median(dequeue_times)
+
+    print("\n" + "=" * 60)
+    print("Circular Queue Benchmark Results")
+    print("=" * 60)
+    print(f"Iterations per trial:   {iterations}")
+    print(f"Trials:                 {trials}")
+    print("-" * 60)
+    print(f"Enqueue median (s):     {enqueue_median:.6f}")
+    print(f"Dequeue median (s):     {dequeue_median:.6f}")
+    print(f"Enqueue / op (ns):      {enqueue_median / iterations * 1e9:.1f}")
+    print(f"Dequeue / op (ns):      {dequeue_median / iterations * 1e9:.1f}")
+    print("=" * 60)
+    print("\nDone.\n")
+
+
 # -------------------------------------------------
 # Entry Point
 # -------------------------------------------------
@@ -134,3 +258,8 @@ if __name__ == "__main__":
         resize=False,
         use_numpy_storage=True
     )
+    benchmark_circular_queue(
+        iterations=1_000_000,
+        trials=5,
+        use_numpy_storage=False
+    )
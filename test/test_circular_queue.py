@@ -0,0 +1,244 @@
+import array
+import copy
+import pickle
+import random
+from collections import deque
+
+import numpy as np
+import pytest
+
+from buffer import CircularBuffer, CCircularBuffer
+
+LOW_INT = -32768
+HIGH_INT = 32767
+
+
+def _next_power_of_2(n):
+    return 1 << (n - 1).bit_length()
+
+
+def _make_list(capacity, **flags):
+    return CircularBuffer(capacity, **flags)
+
+
+def _make_array(capacity, **flags):
+    return CircularBuffer(capacity, TYPECODE="h", **flags)
+
+
+def _make_numpy(capacity, **flags):
+    return CircularBuffer(capacity, NPARR=True, **flags)
+
+
+def _make_c(capacity, **flags):
+    if CCircularBuffer is None:
+        pytest.skip("C extension not built; run `python setup.py build_ext --inplace`")
+    return CCircularBuffer(capacity, **flags)
+
+
+@pytest.fixture(params=[_make_list, _make_array, _make_numpy, _make_c], ids=["list", "array", "numpy", "c"])
+def make(request):
+    return request.param
+
+
+class DequeModel:
+    """Reference semantics for the queue, kept in a deque."""
+
+    def __init__(self, capacity, OVERWRITING=False, RESIZE=False):
+        self.capacity = _next_power_of_2(capacity)
+        self.overwriting = OVERWRITING
+        self.resize = RESIZE
+        self.items = deque()
+
+    def enqueue(self, value):
+        if len(self.items) == self.capacity:
+            if self.overwriting:
+                self.items.popleft()
+            elif self.resize:
+                self.capacity *= 2
+            else:
+                return
+        self.items.append(value)
+
+    def bulk_enqueue(self, values):
+        space = self.capacity - len(self.items)
+        if self.resize and len(values) > space:
+            self.capacity = _next_power_of_2(max(self.capacity * 2, len(self.items) + len(values)))
+            space = self.capacity - len(self.items)
+        if not self.overwriting:
+            values = values[:space]
+        self.items.extend(values)
+        while len(self.items) > self.capacity:
+            self.items.popleft()
+
+    def bulk_dequeue(self, amount):
+        count = max(0, min(amount, len(self.items)))
+        return [self.items.popleft() for _ in range(count)]
+
+
+@pytest.mark.parametrize("flags", [{}, {"OVERWRITING": True}, {"RESIZE": True}], ids=["drop", "overwrite", "resize"])
+@pytest.mark.parametrize("seed", range(5))
+def test_matches_deque_model(make, flags, seed):
+    rng = random.Random(seed)
+    capacity = rng.randint(1, 20)
+    buf = make(capacity, **flags)
+    model = DequeModel(capacity, **flags)
+
+    for _ in range(300):
+        op = rng.randrange(4)
+        if op == 0:
+            value = rng.randint(LOW_INT, HIGH_INT)
+            buf.enqueue(value)
+            model.enqueue(value)
+        elif op == 1:
+            values = [rng.randint(LOW_INT, HIGH_INT) for _ in range(rng.randint(1, 3 * capacity))]
+            buf.bulk_enqueue(values)
+            model.bulk_enqueue(values)
+        elif op == 2 and model.items:
+            assert buf.dequeue() == model.items.popleft()
+        else:
+            amount = rng.randint(0, 2 * capacity)
+            assert list(buf.bulk_dequeue(amount)) == model.bulk_dequeue(amount)
+
+        assert buf.is_empty() == (not model.items)
+        assert buf.is_full() == (len(model.items) == model.capacity)
+        if model.items:
+            assert buf.peek() == model.items[0]
+
+    assert list(buf.bulk_dequeue(len(model.items))) == list(model.items)
+
+
+def test_capacity_rounds_up_to_power_of_2(make):
+    buf = make(5)
+    buf.bulk_enqueue(list(range(10)))
+    assert list(buf.bulk_dequeue(10)) == list(range(8))
+
+
+@pytest.mark.parametrize("capacity", [0, -5])
+def test_non_positive_capacity_raises(make, capacity):
+    with pytest.raises(ValueError):
+        make(capacity)
+
+
+def test_full_queue_drops_without_flags(make):
+    buf = make(2)
+    buf.bulk_enqueue([1, 2])
+    buf.enqueue(3)
+    assert list(buf.bulk_dequeue(4)) == [1, 2]
+
+
+def test_full_queue_raises_with_debug(make):
+    buf = make(2, DEBUG=True)
+    buf.bulk_enqueue([1, 2])
+    with pytest.raises(ValueError):
+        buf.enqueue(3)
+
+
+def test_resize_preserves_order_after_wrap(make):
+    buf = make(4, RESIZE=True)
+    buf.bulk_enqueue([1, 2, 3, 4])
+    buf.bulk_dequeue(2)
+    buf.bulk_enqueue([5, 6])
+    buf.resize(16)
+    buf.bulk_enqueue([7, 8])
+    assert list(buf.bulk_dequeue(16)) == [3, 4, 5, 6, 7, 8]
+
+
+def test_resize_below_size_raises(make):
+    buf = make(8, RESIZE=True)
+    buf.bulk_enqueue([1, 2, 3, 4])
+    with pytest.raises(ValueError):
+        buf.resize(2)
+
+
+def test_bulk_enqueue_strided_int16(make):
+    buf = make(8)
+    buf.bulk_enqueue(np.arange(8, dtype=np.int16)[::2])
+    assert list(buf.bulk_dequeue(8)) == [0, 2, 4, 6]
+
+
+def test_bulk_enqueue_rejects_floats():
+    for buf in (_make_array(4), _make_numpy(4)):
+        with pytest.raises(TypeError):
+            buf.bulk_enqueue([1.5])
+        assert buf.is_empty()
+
+
+def test_c_rejects_foreign_byte_order():
+    buf = _make_c(4)
+    foreign = ">i2" if np.little_endian else "<i2"
+    with pytest.raises(TypeError):
+        buf.bulk_enqueue(np.array([1, 2], dtype=foreign))
+
+
+@pytest.mark.parametrize("make_int16", [_make_numpy, _make_c], ids=["numpy", "c"])
+def test_bulk_dequeue_checks_out(make_int16):
+    buf = make_int16(8)
+    buf.bulk_enqueue([1, 2, 3, 4])
+    with pytest.raises(ValueError, match="out is too small"):
+        buf.bulk_dequeue(4, out=np.zeros(2, dtype=np.int16))
+    with pytest.raises(TypeError, match="out must be an int16 buffer"):
+        buf.bulk_dequeue(4, out=np.zeros(4, dtype=np.float64))
+    assert list(buf.bulk_dequeue(4, out=np.zeros(8, dtype=np.int16))) == [1, 2, 3, 4]
+
+
+def test_nparr_on_list_subclass_raises():
+    class Custom(CircularBuffer):
+        __slots__ = ()
+
+    assert Custom(4)._items == [None] * 4
+    with pytest.raises(TypeError):
+        Custom(4, NPARR=True)
+
+
+def test_typed_bulk_dequeue_of_nothing_keeps_type():
+    assert _make_array(4).bulk_dequeue(2) == array.array("h")
+
+
+def test_numpy_release_ignores_caller_out():
+    buf = _make_numpy(8)
+    user_buf = np.zeros(4, dtype=np.int16)
+    buf.bulk_enqueue([1, 2, 3, 4])
+    buf.release(buf.bulk_dequeue(4, out=user_buf))
+    buf.release(user_buf)
+
+    buf.bulk_enqueue([5, 6, 7, 8])
+    result = buf.bulk_dequeue(4)
+    assert not np.shares_memory(result, user_buf)
+    assert user_buf.tolist() == [1, 2, 3, 4]
+
+
+def test_numpy_release_reuses_array():
+    buf = _make_numpy(8)
+    buf.release(buf.bulk_dequeue(2))  # the first release() only starts tracking
+    buf.bulk_enqueue([1, 2])
+    first = buf.bulk_dequeue(2)
+    buf.release(first)
+
+    buf.bulk_enqueue([3, 4])
+    second = buf.bulk_dequeue(2)
+    assert second is first
+    assert second.tolist() == [3, 4]
+
+
+def test_numpy_release_twice_pools_once():
+    buf = _make_numpy(8)
+    buf.release(buf.bulk_dequeue(2))
+    buf.bulk_enqueue([1, 2])
+    arr = buf.bulk_dequeue(2)
+    buf.release(arr)
+    buf.release(arr)
+
+    buf.bulk_enqueue([1, 2, 3, 4])
+    first = buf.bulk_dequeue(2)
+    second = buf.bulk_dequeue(2)
+    assert first is not second
+    assert first.tolist() == [1, 2]
+    assert second.tolist() == [3, 4]
+
+
+def test_numpy_pickle_and_deepcopy():
+    buf = _make_numpy(4, OVERWRITING=True)
+    buf.bulk_enqueue([1, 2, 3, 4, 5])
+    for clone in (pickle.loads(pickle.dumps(buf)), copy.deepcopy(buf)):
+        clone.enqueue(6)
+        assert clone.bulk_dequeue(4).tolist() == [3, 4, 5, 6]